@@ -38,11 +38,15 @@ class Bound(StateDictSaveable):
         """Number of dimensions."""
         raise NotImplementedError
 
-    def sample(self, n_samples: int) -> np.ndarray:
+    def sample(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
         """Sample.
 
         Args:
             n_samples: Numbe of samples.
+            rng: Random number generator. If None, numpy's global random state
+                is used.
 
         Returns:
             s (n_samples x n_parameters)
@@ -116,13 +120,15 @@ class UnitCubeBound(Bound, StateDictSaveable):
     def n_parameters(self) -> int:
         return self._n_parameters
 
-    def sample(self, n_samples):
+    def sample(self, n_samples, rng=None):
         """Generate samples from the bound region.
 
         Args:
             n_samples (int): Number of samples
+            rng (np.random.Generator): Random number generator (optional)
         """
-        return np.random.rand(n_samples, self.n_parameters)
+        rng = np.random if rng is None else rng
+        return rng.random((n_samples, self.n_parameters))
 
     def __call__(self, u):
         """Evaluate bound.
@@ -133,8 +139,7 @@ class UnitCubeBound(Bound, StateDictSaveable):
         Returns:
             Ones and zeros
         """
-        b = np.where(u <= 1.0, np.where(u >= 0.0, 1.0, 0.0), 0.0)
-        return b.prod(axis=-1)
+        return ((u >= 0.0) & (u <= 1.0)).all(axis=-1).astype(float)
 
     def state_dict(self):
         return dict(tag="UnitCubeBound", n_parameters=self.n_parameters)
@@ -154,30 +159,27 @@ class RectangleBound(Bound, StateDictSaveable):
         Note: 0 <= u_min < u_max  <= 1.
         """
         self._rec_bounds = rec_bounds
+        self._volume = np.prod(rec_bounds[:, 1] - rec_bounds[:, 0])
 
     @property
     def volume(self):
-        V = 1.0
-        for i in range(self.n_parameters):
-            V *= self._rec_bounds[i, 1] - self._rec_bounds[i, 0]
-        return V
+        return self._volume
 
     @property
     def n_parameters(self):
         return len(self._rec_bounds)
 
-    def sample(self, n_samples):
-        u = np.random.rand(n_samples, self.n_parameters)
-        for i in range(self.n_parameters):
-            u[:, i] *= self._rec_bounds[i, 1] - self._rec_bounds[i, 0]
-            u[:, i] += self._rec_bounds[i, 0]
+    def sample(self, n_samples, rng=None):
+        rng = np.random if rng is None else rng
+        low, high = self._rec_bounds[:, 0], self._rec_bounds[:, 1]
+        u = rng.random((n_samples, self.n_parameters))
+        u *= high - low
+        u += low
         return u
 
     def __call__(self, u):
-        m = np.ones(len(u))
-        for i, v in enumerate(self._rec_bounds):
-            m *= np.where(u[:, i] >= v[0], np.where(u[:, i] <= v[1], 1.0, 0.0), 0.0)
-        return m > 0.5
+        low, high = self._rec_bounds[:, 0], self._rec_bounds[:, 1]
+        return ((u >= low) & (u <= high)).all(axis=-1)
 
     def state_dict(self):
         return dict(tag="RectangleBound", rec_bounds=self._rec_bounds)
@@ -188,6 +190,8 @@ class RectangleBound(Bound, StateDictSaveable):
 
 
 class BallsBound(Bound, StateDictSaveable):
+    _max_rows = 1_000_000
+
     def __init__(self, points, scale=1.0):
         """Simple mask based on coverage balls around inducing points.
 
@@ -233,7 +237,7 @@ class BallsBound(Bound, StateDictSaveable):
             in_bounds = ((Y >= 0.0) & (Y <= 1.0)).prod(axis=1, dtype="bool")
             Y = Y[in_bounds]
             counts = bt.query_radius(Y, epsilon, count_only=True)
-            vol_est.append(area * sum(1.0 / counts))
+            vol_est.append(area * np.sum(1.0 / counts))
         vol_est = np.array(vol_est)
         out, err = vol_est.mean(), vol_est.std() / np.sqrt(n_samples)
         rel = err / out
@@ -241,26 +245,36 @@ class BallsBound(Bound, StateDictSaveable):
             log.debug("WARNING: Rel volume uncertainty is %.4g" % rel)
         return out
 
-    def sample(self, n_samples):
+    def sample(self, n_samples, rng=None):
+        rng = np.random if rng is None else rng
         counter = 0
         samples = []
         d = self.X.shape[-1]
+        n_repeats = 1
         while counter < n_samples:
-            n = np.random.randn(*self.X.shape)
+            X = np.tile(self.X, (n_repeats, 1))
+            n = rng.standard_normal(X.shape)
             norm = (n**2).sum(axis=1) ** 0.5
             n = n / norm.reshape(-1, 1)
-            r = np.random.rand(len(self.X)) ** (1 / d) * self.epsilon
-            Y = self.X + n * r.reshape(-1, 1)
+            r = rng.random(len(X)) ** (1 / d) * self.epsilon
+            Y = X + n * r.reshape(-1, 1)
             in_bounds = ((Y >= 0.0) & (Y <= 1.0)).prod(axis=1, dtype="bool")
             Y = Y[in_bounds]
             counts = self.bt.query_radius(Y, r=self.epsilon, count_only=True)
             p = 1.0 / counts
-            w = np.random.rand(len(p))
+            w = rng.random(len(p))
             Y = Y[p >= w]
             samples.append(Y)
             counter += len(Y)
+            # Size the next round from the observed acceptance, so that it likely finishes the job.
+            # Grow at most geometrically and within a fixed row budget, to bound the memory usage.
+            acceptance = max(len(Y), 1) / len(X)
+            n_missing = n_samples - counter
+            n_needed = int(np.ceil(1.2 * n_missing / (acceptance * len(self.X))))
+            max_repeats = max(self._max_rows // len(self.X), 1)
+            n_repeats = max(min(n_needed, 2 * n_repeats, max_repeats), 1)
         samples = np.vstack(samples)
-        ind = np.random.choice(range(len(samples)), size=n_samples, replace=False)
+        ind = rng.choice(len(samples), size=n_samples, replace=False)
         return samples[ind]
 
     def __call__(self, u):
@@ -296,30 +310,33 @@ class CompositBound(Bound, StateDictSaveable):
         """
         self._bounds = bounds_map
         self._n_parameters = n_parameters
+        self._volume = 1.0
+        for v in self._bounds.values():
+            self._volume *= v.volume
 
-    def sample(self, n_samples):
+    def sample(self, n_samples, rng=None):
         results = -np.ones((n_samples, self.n_parameters))
         for k, v in self._bounds.items():
-            results[:, np.array(k)] = v.sample(n_samples)
+            results[:, np.array(k)] = v.sample(n_samples, rng=rng)
         return results
 
     @property
     def volume(self) -> float:
-        volume = 1.0
-        for k, v in self._bounds.items():
-            volume *= v.volume
-        return volume
+        return self._volume
 
     @property
     def n_parameters(self) -> int:
         return self._n_parameters
 
     def __call__(self, u):
-        res = []
+        inside = np.ones(len(u), dtype=bool)
         for k, v in self._bounds.items():
-            r = v(u[:, np.array(k)])
-            res.append(r)
-        return sum(res) == len(res)
+            # Only evaluate the points which have not been rejected by a previous bound.
+            rows = np.flatnonzero(inside)
+            if len(rows) == 0:
+                break
+            inside[rows] = v(u[np.ix_(rows, np.array(k))]) != 0
+        return inside
 
     # - Function: Generate sample from posterior
     #   - Constraints are based on p(u|z)/p(u), and should be (different from what we have in the paper???)
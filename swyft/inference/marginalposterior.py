@@ -69,13 +69,15 @@ class MarginalPosterior:
         Returns:
             empirical mass dict and nominal mass dict for every marginal
         """
-        empirical_mass = {marginal: [] for marginal in self.marginal_indices}
+        empirical_mass = {
+            marginal: np.empty(n_observations) for marginal in self.marginal_indices
+        }
         nominal_mass = {
             marginal: np.linspace(1 / n_observations, 1, n_observations)
             for marginal in self.marginal_indices
         }
 
-        for _ in range(n_observations):
+        for i_observation in range(n_observations):
             ind = np.random.randint(n_observations)
             observation_o, _, v_o = dataset[ind]
             logw_o = self.marginal_ratio_estimator.log_ratio(
@@ -98,9 +100,11 @@ class MarginalPosterior:
                 percent_above_true_param_density = (
                     sum_above_true_param_density / w_s[marginal_index].sum()
                 )
-                empirical_mass[marginal_index].append(percent_above_true_param_density)
-        for marginal_index, mass in empirical_mass.items():
-            empirical_mass[marginal_index] = np.asarray(sorted(mass))
+                empirical_mass[marginal_index][
+                    i_observation
+                ] = percent_above_true_param_density
+        for mass in empirical_mass.values():
+            mass.sort()
 
         return empirical_mass, nominal_mass
 
@@ -188,7 +192,11 @@ class MarginalPosterior:
 
         # define the work left to do, the place to put it, and the end result / output.
         remaining_marginal_indices = set(marginal_log_MAP.keys())
-        collector = {k: [] for k in remaining_marginal_indices}
+        collector = {
+            k: np.empty((n_samples, len(k)), dtype=weighted_samples.v.dtype)
+            for k in remaining_marginal_indices
+        }
+        n_collected = {k: 0 for k in remaining_marginal_indices}
         out = {}
 
         # Do the rejection sampling.
@@ -203,22 +211,24 @@ class MarginalPosterior:
                 for marginal_index in remaining_marginal_indices
             }
 
-            # Draw and determine if samples are kept
+            # Draw and determine if samples are kept, log(U) ~ -Exponential(1) for U ~ Uniform(0, 1)
             to_keep = {
                 marginal_index: np.less_equal(
-                    np.log(np.random.rand(*log_prob.shape)), log_prob
+                    -np.random.standard_exponential(log_prob.shape), log_prob
                 )
                 for marginal_index, log_prob in log_prob_to_keep.items()
             }
 
-            # Collect samples for every tuple of parameters, if there are enough, add them to out.
+            # Write kept samples into the preallocated buffers, if they are full, add them to out.
             for marginal_index in remaining_marginal_indices:
-                all_parameters_to_keep = weighted_samples.v[to_keep[marginal_index]]
-                marginal_to_keep = all_parameters_to_keep[..., marginal_index]
-                collector[marginal_index].append(marginal_to_keep)
-                concatenated = np.concatenate(collector[marginal_index])[:n_samples]
-                if len(concatenated) == n_samples:
-                    out[marginal_index] = concatenated
+                start = n_collected[marginal_index]
+                rows = np.flatnonzero(to_keep[marginal_index])[: n_samples - start]
+                collector[marginal_index][start : start + len(rows)] = np.take(
+                    weighted_samples.v[rows], marginal_index, axis=-1
+                )
+                n_collected[marginal_index] += len(rows)
+                if n_collected[marginal_index] == n_samples:
+                    out[marginal_index] = collector[marginal_index]
 
             # Remove the param_tuples which we already have in out, thus to avoid calculating them anymore.
             for marginal_index in out.keys():
@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from typing import (
     Callable,
     Dict,
@@ -28,6 +29,25 @@ SchedulerType = Union[
 ]
 
 
+def _inference_mode():
+    """Return `torch.inference_mode`, or `torch.no_grad` for torch < 1.9."""
+    if hasattr(torch, "inference_mode"):
+        return torch.inference_mode()
+    return torch.no_grad()
+
+
+def _autocast(device_type: str, dtype: Optional[torch.dtype]):
+    """Return `torch.autocast` with `dtype`, or a no-op context when `dtype` is None.
+
+    `torch.autocast` requires torch >= 1.10; only the mixed precision path needs it.
+    """
+    if dtype is None:
+        return nullcontext()
+    if not hasattr(torch, "autocast"):
+        raise RuntimeError("autocast_dtype requires torch >= 1.10.")
+    return torch.autocast(device_type, dtype=dtype)
+
+
 def split_length_by_percentage(length: int, percents: Sequence[float]) -> Sequence[int]:
     """Given the length of a sequence, return the indices which would divide it into `percents` parts.
     Any rounding errors go into the first part.
@@ -98,7 +118,8 @@ def double_observation(f: torch.Tensor) -> torch.Tensor:
     Returns:
         Observation vectors (2*n_batch, ...)
     """
-    return torch.repeat_interleave(f, 2, dim=0)
+    n_batch, *shape = f.shape
+    return f.unsqueeze(1).expand(n_batch, 2, *shape).reshape(2 * n_batch, *shape)
 
 
 def double_parameters(parameters: torch.Tensor) -> torch.Tensor:
@@ -112,8 +133,10 @@ def double_parameters(parameters: torch.Tensor) -> torch.Tensor:
     """
     n_batch, n_parameters = parameters.shape
     assert n_batch % 2 == 0, "n_batch must be divisible by two."
-    out = torch.repeat_interleave(parameters.view(-1, 2 * n_parameters), 2, dim=0).view(
-        -1, n_parameters
+    out = (
+        parameters.reshape(-1, 1, 2 * n_parameters)
+        .expand(-1, 2, -1)
+        .reshape(2 * n_batch, n_parameters)
     )
     return out
 
@@ -138,7 +161,7 @@ class MarginalRatioEstimator(StateDictSaveable):
 
         Args:
             marginal_indices: marginals of interest defined by the parameter index
-            network: a neural network which accepts `observation` and `parameters` and returns `len(marginal_indices)` ratios.
+            network: a neural network which accepts `observation` and `parameters` and returns `len(marginal_indices)` ratios. It must implement `HeadTailClassifier`.
             device
         """
         self.marginal_indices = tupleize_marginal_indices(marginal_indices)
@@ -148,7 +171,7 @@ class MarginalRatioEstimator(StateDictSaveable):
 
         self.epoch = None
         self.best_network_state_dict = None
-        self.min_loss = float("-Inf")
+        self.min_loss = float("Inf")
         self.optimizer = None
         self.scheduler = None
 
@@ -166,6 +189,7 @@ class MarginalRatioEstimator(StateDictSaveable):
         nworkers: int = 0,
         non_blocking: bool = True,
         pin_memory: bool = True,
+        autocast_dtype: Optional[torch.dtype] = None,
     ) -> None:
         """Train the ratio estimator based off of a `dataset` containing observation and parameter pairs.
 
@@ -185,6 +209,7 @@ class MarginalRatioEstimator(StateDictSaveable):
             nworkers: number of workers to divide `dataloader` duties between. 0 implies one thread for training and dataloading.
             non_blocking: consult torch documentation, generally use `True`
             pin_memory: consult torch documentation, generally use `True`
+            autocast_dtype: run forward passes under `torch.autocast` with this dtype, e.g. `torch.bfloat16`. `torch.float16` on cuda also enables gradient scaling. `None` trains in full precision.
         """
         if early_stopping_patience is None:
             early_stopping_patience = max_epochs
@@ -212,6 +237,11 @@ class MarginalRatioEstimator(StateDictSaveable):
             drop_last=True,
         )
 
+        device_type = torch.device(self.device).type
+        scaler = torch.cuda.amp.GradScaler(
+            enabled=autocast_dtype == torch.float16 and device_type == "cuda"
+        )
+
         n_validation_batches = len(valid_loader) if len(valid_loader) != 0 else 1
         validation_losses = []
         self.epoch, fruitless_epoch = 0, 0
@@ -223,42 +253,45 @@ class MarginalRatioEstimator(StateDictSaveable):
                 observation = swyft.utils.dict_to_device(
                     observation, device=self.device, non_blocking=non_blocking
                 )
-                v = v.to(self.device)
-                loss = self._loss(observation, v).sum(dim=0)
-                loss.backward()
-                self.optimizer.step()
+                v = v.to(self.device, non_blocking=non_blocking)
+                with _autocast(device_type, autocast_dtype):
+                    loss = self._loss(observation, v).sum(dim=0)
+                scaler.scale(loss).backward()
+                scaler.step(self.optimizer)
+                scaler.update()
 
             self.epoch += 1
 
             # Evaluation
             self.network.eval()
             loss_sum = 0
-            with torch.no_grad():
+            with _inference_mode():
                 for observation, _, v in valid_loader:
                     observation = swyft.utils.dict_to_device(
                         observation, device=self.device, non_blocking=non_blocking
                     )
-                    v = v.to(self.device)
-                    validation_loss = self._loss(observation, v).sum(dim=0)
-                    loss_sum += validation_loss
+                    v = v.to(self.device, non_blocking=non_blocking)
+                    with _autocast(device_type, autocast_dtype):
+                        validation_loss = self._loss(observation, v).sum(dim=0)
+                    loss_sum += validation_loss.float()
                 loss_avg = loss_sum / n_validation_batches
-                print(
-                    "\rtraining: lr=%.2g, epoch=%i, validation loss=%.4g"
-                    % (self._get_last_lr(self.scheduler), self.epoch, loss_avg),
-                    end="",
-                    flush=True,
-                )
-                validation_losses.append(loss_avg)
+            print(
+                "\rtraining: lr=%.2g, epoch=%i, validation loss=%.4g"
+                % (self._get_last_lr(self.scheduler), self.epoch, loss_avg),
+                end="",
+                flush=True,
+            )
+            validation_losses.append(loss_avg)
 
-                if self.epoch == 0 or self.min_loss > loss_avg:
-                    fruitless_epoch = 0
-                    self.min_loss = loss_avg
-                    self.best_network_state_dict = self.network.state_dict()
-                else:
-                    fruitless_epoch += 1
+            if self.epoch == 0 or self.min_loss > loss_avg:
+                fruitless_epoch = 0
+                self.min_loss = loss_avg
+                self._store_best_network_state_dict()
+            else:
+                fruitless_epoch += 1
 
-                if self.scheduler is not None:
-                    self.scheduler.step(loss_avg)
+            if self.scheduler is not None:
+                self.scheduler.step(loss_avg)
         print("")
         return validation_losses
 
@@ -267,6 +300,7 @@ class MarginalRatioEstimator(StateDictSaveable):
         observation: ObsType,
         v: Array,
         batch_size: Optional[int] = None,
+        autocast_dtype: Optional[torch.dtype] = None,
     ) -> MarginalToArray:
         """Evaluate the ratio estimator on a single `observation` with many `parameters`.
         The `parameters` correspond to `v`, i.e. the "physical" parameterization.
@@ -276,6 +310,7 @@ class MarginalRatioEstimator(StateDictSaveable):
             observation: a single observation to estimate ratios on (Cannot have a batch dimension!)
             v: parameters
             batch_size: divides the evaluation into batches of this size
+            autocast_dtype: evaluate the network under `torch.autocast` with this dtype, e.g. `torch.bfloat16`. `None` evaluates in full precision.
 
         Returns:
             MarginalToArray: the ratios of each marginal in `marginal_indices`. Each marginal index is a key.
@@ -283,31 +318,26 @@ class MarginalRatioEstimator(StateDictSaveable):
         was_training = self.network.training
         self.network.eval()
 
-        with torch.no_grad():
+        device_type = torch.device(self.device).type
+        with _inference_mode(), _autocast(device_type, autocast_dtype):
             observation = dict_array_to_tensor(observation, device=self.device)
             features = self.network.head(
                 {key: value.unsqueeze(0) for key, value in observation.items()}
             )
             len_v = len(v)
-            if batch_size is None or len_v <= batch_size:
-                v = array_to_tensor(v, device=self.device)
-                repeated_features = features.expand(v.size(0), *features.shape[1:])
-                ratio = self.network.tail(repeated_features, v).cpu().numpy()
-            else:
-                ratio = []
-                for i in range(len_v // batch_size + 1):
-                    parameter_batch = array_to_tensor(
-                        v[i * batch_size : (i + 1) * batch_size, :],
-                        device=self.device,
-                    )
-                    feature_batch = features.expand(
-                        parameter_batch.size(0), *features.shape[1:]
-                    )
-                    ratio_batch = (
-                        self.network.tail(feature_batch, parameter_batch).cpu().numpy()
-                    )
-                    ratio.append(ratio_batch)
-                ratio = np.vstack(ratio)
+            batch_size = batch_size or max(len_v, 1)
+            ratio = torch.empty((len_v, len(self.marginal_indices)), device=self.device)
+            for start in range(0, len_v, batch_size):
+                parameter_batch = array_to_tensor(
+                    v[start : start + batch_size], device=self.device
+                )
+                feature_batch = features.expand(
+                    parameter_batch.size(0), *features.shape[1:]
+                )
+                ratio[start : start + batch_size] = self.network.tail(
+                    feature_batch, parameter_batch
+                )
+            ratio = ratio.cpu().numpy()
 
         if was_training:
             self.network.train()
@@ -316,6 +346,20 @@ class MarginalRatioEstimator(StateDictSaveable):
 
         return {k: ratio[..., i] for i, k in enumerate(self.marginal_indices)}
 
+    def _store_best_network_state_dict(self) -> None:
+        """Copy the current network weights into `best_network_state_dict`, reusing its cpu tensors."""
+        state_dict = self.network.state_dict()
+        if self.best_network_state_dict is None or (
+            self.best_network_state_dict.keys() != state_dict.keys()
+        ):
+            self.best_network_state_dict = {
+                key: value.detach().to("cpu", copy=True)
+                for key, value in state_dict.items()
+            }
+        else:
+            for key, value in state_dict.items():
+                self.best_network_state_dict[key].copy_(value)
+
     @staticmethod
     def _repeat_observation_to_match_v(
         observation: Dict[Hashable, torch.Tensor], v: torch.Tensor
@@ -358,18 +402,17 @@ class MarginalRatioEstimator(StateDictSaveable):
             [value.size(0) == n_batch for value in observation.values()]
         ), "The observation batch_size must agree with the parameter batch_size."
 
-        # Repeat interleave
-        observation_doubled = valmap(double_observation, observation)
+        # Run the head once per observation, then repeat interleave its (smaller) features
+        features = self.network.head(observation)
+        features_doubled = double_observation(features)
         parameters_doubled = double_parameters(parameters)
 
-        lnL = self.network(observation_doubled, parameters_doubled)
+        lnL = self.network.tail(features_doubled, parameters_doubled)
         lnL = lnL.view(-1, 4, lnL.shape[-1])
 
-        loss = -torch.nn.functional.logsigmoid(lnL[:, 0])
-        loss += -torch.nn.functional.logsigmoid(-lnL[:, 1])
-        loss += -torch.nn.functional.logsigmoid(-lnL[:, 2])
-        loss += -torch.nn.functional.logsigmoid(lnL[:, 3])
-        loss = loss.sum(axis=0) / n_batch
+        # Joint pairs (0, 3) are scored with logsigmoid(lnL), marginal pairs (1, 2) with logsigmoid(-lnL).
+        signs = lnL.new_tensor([1.0, -1.0, -1.0, 1.0]).view(1, 4, 1)
+        loss = -torch.nn.functional.logsigmoid(lnL * signs).sum(dim=(0, 1)) / n_batch
 
         return loss
 
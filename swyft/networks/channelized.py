@@ -24,8 +24,15 @@ class LinearWithChannel(torch.nn.Module):
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         assert x.ndim >= 2, "Requires (..., channel, features) shape."
-        x = x.unsqueeze(-1)
-        result = torch.matmul(self.weights, x).squeeze(-1) + self.bias
+        # A single batched gemm over channels; matmul with an unsqueezed x instead
+        # broadcasts to one matrix-vector product per batch element and channel.
+        if x.ndim == 3:
+            # (N, C, I): baddbmm also fuses the bias add into the gemm.
+            result = torch.baddbmm(
+                self.bias.unsqueeze(1), x.transpose(0, 1), self.weights.transpose(1, 2)
+            ).transpose(0, 1)
+        else:
+            result = torch.einsum("coi,...ci->...co", self.weights, x) + self.bias
         return result
 
 
@@ -130,7 +137,10 @@ class ResidualNetWithChannel(nn.Module):
         self.final_layer = LinearWithChannel(channels, hidden_features, out_features)
 
     def forward(self, inputs: torch.Tensor) -> torch.Tensor:
-        temps = self.initial_layer(inputs)
+        return self.forward_hidden(self.initial_layer(inputs))
+
+    def forward_hidden(self, temps: torch.Tensor) -> torch.Tensor:
+        """Finish the forward pass from the output of `initial_layer`."""
         for block in self.blocks:
             temps = block(temps)
         outputs = self.final_layer(temps)
@@ -3,6 +3,7 @@ from typing import Dict, Hashable, Tuple
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 
 import swyft
 import swyft.utils
@@ -91,7 +92,8 @@ class ParameterTransform(nn.Module):
 
     def forward(self, parameters: torch.Tensor) -> torch.Tensor:
         parameters = self.online_z_score(parameters)
-        return self.get_marginal_block(parameters, self.marginal_indices)  # B, M, P
+        # marginal_indices was validated at construction, gather the block directly.
+        return parameters[..., self.marginal_indices]  # B, M, P
 
     @property
     def marginal_block_shape(self) -> Tuple[int, int]:
@@ -123,9 +125,8 @@ class ParameterTransform(nn.Module):
         ), f"Each tuple in {tuple_marginal_indices} must have the same length."
 
         if depth in [0, 1, 2]:
-            return torch.stack(
-                [parameters[..., mi] for mi in tuple_marginal_indices], dim=1
-            )
+            index = torch.as_tensor(tuple_marginal_indices, device=parameters.device)
+            return parameters[..., index]
         else:
             raise ValueError(
                 f"{marginal_indices} must be of the form (a) 2, (b) [2, 3], (c) [2, [1, 3]], or (d) [[0, 1], [1, 2]]."
@@ -158,9 +159,17 @@ class MarginalClassifier(nn.Module):
     def forward(
         self, features: torch.Tensor, marginal_block: torch.Tensor
     ) -> torch.Tensor:
-        fb = features.unsqueeze(1).expand(-1, self.n_marginals, -1)  # B, M, O
-        combined = torch.cat([fb, marginal_block], dim=2)  # B, M, O + P
-        return self.net(combined).squeeze(-1)  # B, M
+        # Same as self.net(cat([features expanded to B, M, O, marginal_block], dim=2)),
+        # but the initial layer is split so features are not replicated per marginal.
+        initial_layer = self.net.initial_layer
+        n_features = features.size(-1)
+        weights_features = initial_layer.weights[..., :n_features]  # M, H, O
+        weights_block = initial_layer.weights[..., n_features:]  # M, H, P
+        hidden = F.linear(features, weights_features.flatten(0, 1))  # B, M * H
+        hidden = hidden.view(features.size(0), self.n_marginals, -1)  # B, M, H
+        hidden = hidden + initial_layer.bias
+        hidden = hidden + torch.einsum("mhp,bmp->bmh", weights_block, marginal_block)
+        return self.net.forward_hidden(hidden).squeeze(-1)  # B, M
 
 
 class Network(nn.Module, HeadTailClassifier):
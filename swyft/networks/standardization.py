@@ -38,22 +38,21 @@ class OnlineStandardizingLayer(nn.Module):
         self, x: torch.Tensor
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         assert x.shape[1:] == self.shape
-        na = self.n.clone()
+        na = self.n
         nb = x.shape[0]
         nab = na + nb
 
-        xa = self._mean.clone()
-        xb = x.mean(dim=0)
+        # one pass over the batch for both moments
+        varb, xb = torch.var_mean(x, dim=0, unbiased=False)
+        xa = self._mean
         delta = xb - xa
         if self.stable:
             xab = (na * xa + nb * xb) / nab
         else:
             xab = xa + delta * nb / nab
 
-        m2a = self._M2.clone()
-        m2b = (
-            x.var(dim=(0,), unbiased=False) * nb
-        )  # do not use bessel's correction then multiply by total number of items in batch.
+        m2a = self._M2
+        m2b = varb * nb  # varb has no bessel's correction, so this is the batch M2.
         m2ab = m2a + m2b + delta**2 * na * nb / nab
         return nab, xab, m2ab
 
@@ -68,10 +67,12 @@ class OnlineStandardizingLayer(nn.Module):
 
     @property
     def var(self) -> torch.Tensor:
-        if self.n > 1:
-            return self._M2 / (self.n - 1)
-        else:
-            return torch.zeros_like(self._M2)
+        # Branch on the device, a python `if self.n > 1` would synchronize on every call.
+        return torch.where(
+            self.n > 1,
+            self._M2 / (self.n - 1).clamp(min=1),
+            torch.zeros_like(self._M2),
+        )
 
     @property
     def std(self) -> torch.Tensor:
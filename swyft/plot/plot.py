@@ -1,6 +1,10 @@
 import numpy as np
 import pylab as plt
-from scipy.integrate import simps
+
+try:
+    from scipy.integrate import simpson
+except ImportError:  # scipy < 1.6
+    from scipy.integrate import simps as simpson
 
 
 def grid_interpolate_samples(x, y, bins=1000, return_norm=False):
@@ -8,7 +12,7 @@ def grid_interpolate_samples(x, y, bins=1000, return_norm=False):
     x, y = x[idx], y[idx]
     x_grid = np.linspace(x[0], x[-1], bins)
     y_grid = np.interp(x_grid, x, y)
-    norm = simps(y_grid, x_grid)
+    norm = simpson(y_grid, x=x_grid)
     y_grid_normed = y_grid / norm
     if return_norm:
         return x_grid, y_grid_normed, norm
@@ -21,8 +25,8 @@ def get_HDI_thresholds(x, cred_level=[0.68268, 0.95450, 0.99730]):
     x = np.sort(x)[::-1]  # Sort backwards
     total_mass = x.sum()
     enclosed_mass = np.cumsum(x)
-    idx = [np.argmax(enclosed_mass >= total_mass * f) for f in cred_level]
-    levels = np.array(x[idx])
+    idx = np.searchsorted(enclosed_mass, total_mass * np.asarray(cred_level))
+    levels = np.array(x[np.minimum(idx, len(x) - 1)])
     return levels
 
 
@@ -87,7 +91,7 @@ def plot_posterior(
         int2 = zm[v > levels[2]].min(), zm[v > levels[2]].max()
         int1 = zm[v > levels[1]].min(), zm[v > levels[1]].max()
         int0 = zm[v > levels[0]].min(), zm[v > levels[0]].max()
-        entropy = -simps(v * np.log(v), zm)
+        entropy = -simpson(v * np.log(v), x=zm)
         return dict(
             mean=mean, mode=mode, HDI1=int2, HDI2=int1, HDI3=int0, entropy=entropy
         )
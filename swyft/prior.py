@@ -1,8 +1,10 @@
-from functools import partial
+from functools import lru_cache, partial
 from importlib import import_module
-from typing import Callable, Sequence, Type, TypeVar
+from typing import Callable, Optional, Sequence, Tuple, Type, TypeVar
+from warnings import warn
 
 import numpy as np
+import scipy.special
 import torch
 from toolz import compose
 from toolz.dicttoolz import keyfilter
@@ -41,6 +43,7 @@ class PriorTruncator(StateDictSaveable):
         if bound is None:
             bound = UnitCubeBound(prior.n_parameters)
         self.bound = bound
+        self._log_volume = float(np.log(self.bound.volume))
 
     @property
     def cdf(self) -> Callable:
@@ -54,34 +57,57 @@ class PriorTruncator(StateDictSaveable):
     def n_parameters(self) -> int:
         return self.prior.n_parameters
 
-    def sample(self, n_samples: int) -> np.ndarray:
+    def sample(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
         """Sample from truncated prior.
 
         Args:
             n_samples: Number of samples to return
+            rng: Random number generator. If None, numpy's global random state is used.
 
         Returns:
             Samples: (n_samples, n_parameters)
         """
-        u = self.bound.sample(n_samples)
-        return self.prior.icdf(u)
+        v, _ = self.sample_with_u(n_samples, rng=rng)
+        return v
+
+    def sample_with_u(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Sample from truncated prior, also returning the hypercube samples.
+
+        Args:
+            n_samples: Number of samples to return
+            rng: Random number generator. If None, numpy's global random state is used.
 
-    def log_prob(self, v: np.ndarray) -> np.ndarray:
+        Returns:
+            Samples: (n_samples, n_parameters), Hypercube samples: (n_samples, n_parameters)
+        """
+        u = self.bound.sample(n_samples, rng=rng)
+        return self.prior.icdf(u), u
+
+    def log_prob(self, v: np.ndarray, u: Optional[np.ndarray] = None) -> np.ndarray:
         """Evaluate log probability.
 
         Args:
             v: (N, n_parameters) parameter points.
+            u: (optional) (N, n_parameters) hypercube points of v, e.g. from `sample_with_u`. Saves evaluating the cdf.
 
         Returns:
             log_prob: (N,)
         """
-        u = self.prior.cdf(v)
-        b = np.where(u.sum(axis=-1) == np.inf, 0.0, self.bound(u))
-        log_prob = np.where(
-            b == 0.0,
-            -np.inf,
-            self.prior.log_prob(v).sum(axis=-1) - np.log(self.bound.volume),
-        )
+        if u is None:
+            u = self.prior.cdf(v)
+        # Only evaluate the bound and the prior where the previous step did not already reject.
+        inside = np.isfinite(u).all(axis=-1)
+        if np.any(inside):
+            inside[inside] = self.bound(u[inside]) != 0.0
+        log_prob = np.full(len(u), -np.inf)
+        if np.any(inside):
+            log_prob[inside] = (
+                self.prior.log_prob(v[inside]).sum(axis=-1) - self._log_volume
+            )
         return log_prob
 
     def state_dict(self) -> dict:
@@ -94,7 +120,66 @@ class PriorTruncator(StateDictSaveable):
         return cls(prior, bound)
 
 
+def _grid_bracket(x: np.ndarray, xp: np.ndarray, uniform: bool = False) -> np.ndarray:
+    """Index k of the grid interval [xp[k], xp[k + 1]] containing x, clipped to valid intervals.
+
+    Args:
+        x: points to locate
+        xp: increasing grid
+        uniform: ``True`` if xp is evenly spaced. Then k is computed directly instead of bisecting.
+
+    Returns:
+        k with the shape of x
+    """
+    if uniform:
+        k = np.floor((x - xp[0]) * ((len(xp) - 1) / (xp[-1] - xp[0])))
+        # fmax / fmin also map nan to a valid index, the caller masks those points
+        return np.fmin(np.fmax(k, 0), len(xp) - 2).astype(np.intp)
+    return np.clip(np.searchsorted(xp, x, side="right") - 1, 0, len(xp) - 2)
+
+
+def _interp_shared_grid(
+    x: np.ndarray,
+    xp: np.ndarray,
+    fp: np.ndarray,
+    left: float,
+    right: float,
+    uniform: bool = False,
+) -> np.ndarray:
+    """Column-wise ``np.interp(x[:, i], xp, fp[i], left, right)`` for all columns at once.
+
+    Args:
+        x: (N, n_parameters) points to evaluate
+        xp: (n_grid_points,) increasing grid, shared by all columns
+        fp: (n_parameters, n_grid_points) tabulated values of every column
+        left: value for x < xp[0]
+        right: value for x > xp[-1]
+        uniform: ``True`` if xp is evenly spaced, see `_grid_bracket`
+
+    Returns:
+        (N, n_parameters) interpolated values
+    """
+    x = np.asarray(x)
+    k = _grid_bracket(x, xp, uniform)
+    columns = np.arange(fp.shape[0])
+    f0, f1 = fp[columns, k], fp[columns, k + 1]
+    t = (x - xp[k]) / (xp[k + 1] - xp[k])
+    with np.errstate(invalid="ignore"):
+        # same fallbacks as np.interp when the table contains infinities
+        slope = f1 - f0
+        out = f0 + slope * t
+        out = np.where(np.isnan(out), f1 + slope * (t - 1), out)
+        out = np.where(np.isnan(out) & (f0 == f1), f0, out)
+    out = np.where(t == 0, f0, out)
+    out = np.where(x < xp[0], left, out)
+    out = np.where(x > xp[-1], right, out)
+    return out
+
+
 class InterpolatedTabulatedDistribution:
+    # log density of a flat table segment (a point mass), the largest finite log value
+    _flat_segment_log_prob = float(np.log(np.finfo(float).max))
+
     def __init__(self, icdf: Callable, n_parameters: int, n_grid_points: int) -> None:
         r"""Create a distribution based off of a icdf. The distribution is defined by interpolating grid points.
 
@@ -117,10 +202,15 @@ class InterpolatedTabulatedDistribution:
     def _generate_table(
         uv: Callable, grid: np.ndarray, n_parameters: int
     ) -> np.ndarray:
-        table = []
-        for x in grid:
-            table.append(uv(np.ones(n_parameters) * x))
-        return np.array(table).T
+        # evaluate the whole grid in a single batched call, u has shape (n_grid_points, n_parameters)
+        u = np.repeat(grid[:, None], n_parameters, axis=1)
+        table = np.asarray(uv(u))
+        if table.shape != u.shape:
+            raise ValueError(
+                f"icdf must map a batch of shape {u.shape} to the same shape, got {table.shape}."
+            )
+        # (n_parameters, n_grid_points), contiguous so that every parameter's table is a unit-stride row
+        return np.ascontiguousarray(table.T)
 
     def cdf(self, v: np.ndarray) -> np.ndarray:
         """Map onto hypercube: v -> u
@@ -131,12 +221,13 @@ class InterpolatedTabulatedDistribution:
         Returns:
             u: (N, n_parameters) hypercube parameter array
         """
-        u = np.empty_like(v)
+        # every parameter has its own table, fill a (n_parameters, N) buffer row by row
+        u = np.empty((self.n_parameters, len(v)))
         for i in range(self.n_parameters):
-            u[:, i] = np.interp(
+            u[i] = np.interp(
                 v[:, i], self._table[i], self._grid, left=np.inf, right=np.inf
             )
-        return u
+        return u.T
 
     def icdf(self, u: np.ndarray) -> np.ndarray:
         """Map from hypercube: u -> v
@@ -147,36 +238,113 @@ class InterpolatedTabulatedDistribution:
         Returns:
             v: (N, n_parameters) physical parameter array
         """
-        v = np.empty_like(u)
-        for i in range(self.n_parameters):
-            v[:, i] = np.interp(
-                u[:, i], self._grid, self._table[i], left=np.inf, right=np.inf
-            )
-        return v
+        # the grid is shared by all parameters, so interpolate them in one go
+        return _interp_shared_grid(
+            u, self._grid, self._table, left=np.inf, right=np.inf, uniform=True
+        )
 
-    def log_prob(self, v: np.ndarray, du: float = 1e-6) -> np.ndarray:
+    def log_prob(self, v: np.ndarray, du: Optional[float] = None) -> np.ndarray:
         """Log probability.
 
+        The pdf is du / dv, the inverse slope of the interpolated table at u.
+        On flat segments of the table the log pdf is capped at the largest
+        finite log value.
+
         Args:
             v: (N, n_parameters) physical parameter array
-            du: Step-size of numerical derivatives
+            du: Deprecated and ignored, the slope is exact.
 
         Returns:
             log_prob: (N, n_parameters) factors of pdf
         """
-        dv = np.empty_like(v)
-        u = self.cdf(v)
-        for i in range(self.n_parameters):
-            dv[:, i] = np.interp(
-                u[:, i] + (du / 2), self._grid, self._table[i], left=None, right=None
+        if du is not None:
+            warn(
+                "The du argument of log_prob is deprecated and ignored.",
+                DeprecationWarning,
             )
-            dv[:, i] -= np.interp(
-                u[:, i] - (du / 2), self._grid, self._table[i], left=None, right=None
-            )
-        log_prob = np.where(u == np.inf, -np.inf, np.log(du) - np.log(dv + 1e-300))
+        u = self.cdf(v)
+        k = _grid_bracket(u, self._grid, uniform=True)
+        columns = np.arange(self.n_parameters)
+        grid_step = self._grid[k + 1] - self._grid[k]
+        dv = self._table[columns, k + 1] - self._table[columns, k]
+        # a flat table segment (dv == 0) is capped, so that sums of log_prob stay finite
+        log_prob = np.full(dv.shape, self._flat_segment_log_prob)
+        sloped = dv > 0
+        log_prob[sloped] = np.log(grid_step[sloped]) - np.log(dv[sloped])
+        log_prob[np.isinf(u)] = -np.inf
         return log_prob
 
 
+def _validate_support(v: np.ndarray, low: np.ndarray, high: np.ndarray) -> None:
+    """Raise like torch's validate_args when v is outside of [low, high]."""
+    if not np.all((low <= v) & (v <= high)):
+        raise ValueError(
+            f"Expected value argument to be within the support [{low}, {high}] of the prior."
+        )
+
+
+def _uniform_cdf(
+    v: np.ndarray, low: np.ndarray, high: np.ndarray, validate_args: bool
+) -> np.ndarray:
+    v = np.asarray(v)
+    if validate_args:
+        _validate_support(v, low, high)
+    return np.clip((v - low) / (high - low), 0.0, 1.0)
+
+
+def _uniform_icdf(u: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    return low + np.asarray(u) * (high - low)
+
+
+def _uniform_log_prob(
+    v: np.ndarray, low: np.ndarray, high: np.ndarray, validate_args: bool
+) -> np.ndarray:
+    v = np.asarray(v)
+    if validate_args:
+        _validate_support(v, low, high)
+    with np.errstate(divide="ignore"):
+        return np.log((low <= v) & (v < high)) - np.log(high - low)
+
+
+def _normal_cdf(
+    v: np.ndarray, loc: np.ndarray, scale: np.ndarray, validate_args: bool
+) -> np.ndarray:
+    v = np.asarray(v)
+    if validate_args:
+        _validate_support(v, -np.inf, np.inf)
+    return scipy.special.ndtr((v - loc) / scale)
+
+
+def _normal_icdf(u: np.ndarray, loc: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    return loc + scale * scipy.special.ndtri(np.asarray(u))
+
+
+def _normal_log_prob(
+    v: np.ndarray, loc: np.ndarray, scale: np.ndarray, validate_args: bool
+) -> np.ndarray:
+    v = np.asarray(v)
+    if validate_args:
+        _validate_support(v, -np.inf, np.inf)
+    return -0.5 * ((v - loc) / scale) ** 2 - np.log(scale) - 0.5 * np.log(2 * np.pi)
+
+
+@lru_cache(maxsize=None)
+def _get_distribution_class(module: str, name: str) -> Type:
+    """Resolve a distribution class once per (module, name) when loading priors."""
+    return getattr(import_module(module), name)
+
+
+def _apply_to_tensor(
+    function: Callable[[torch.Tensor], torch.Tensor], array: np.ndarray
+) -> np.ndarray:
+    # array_to_tensor is already a zero-copy from_numpy view when no cast is needed,
+    # and the output is a fresh tensor unless function returned (a view of) its input.
+    out = tensor_to_array(function(array_to_tensor(array)), copy=False)
+    if isinstance(array, np.ndarray) and np.may_share_memory(out, array):
+        out = out.copy()
+    return out
+
+
 # TODO this could be improved with some thought
 # it merely wraps a torch distribution and keeps track of the arguments...
 class Prior(StateDictSaveable):
@@ -235,10 +403,11 @@ class Prior(StateDictSaveable):
         assert (
             len(distribution.event_shape) == 0
         ), f"{distribution} must be factorizable and report the log_prob of every dimension (i.e. all dims are in batch_shape)"
+        cdf, icdf, log_prob = cls._get_numpy_functions(distribution)
         prior = cls(
-            cdf=cls.conjugate_tensor_func(distribution.cdf),
-            icdf=cls.conjugate_tensor_func(distribution.icdf),
-            log_prob=cls.conjugate_tensor_func(distribution.log_prob),
+            cdf=cdf,
+            icdf=icdf,
+            log_prob=log_prob,
             n_parameters=distribution.batch_shape.numel(),
         )
         prior.distribution = distribution
@@ -293,6 +462,43 @@ class Prior(StateDictSaveable):
         }
         return prior
 
+    @classmethod
+    def _get_numpy_functions(
+        cls, distribution: torch.distributions.Distribution
+    ) -> Tuple[Callable, Callable, Callable]:
+        """cdf, icdf and log_prob of a torch distribution as functions of arrays.
+
+        Uniform and Normal are evaluated directly in numpy, which avoids the tensor round trip on every call.
+        Any other distribution is wrapped with `conjugate_tensor_func`.
+        """
+        validate_args = distribution._validate_args
+        if type(distribution) is Uniform:
+            low = tensor_to_array(distribution.low)
+            high = tensor_to_array(distribution.high)
+            return (
+                partial(_uniform_cdf, low=low, high=high, validate_args=validate_args),
+                partial(_uniform_icdf, low=low, high=high),
+                partial(
+                    _uniform_log_prob, low=low, high=high, validate_args=validate_args
+                ),
+            )
+        elif type(distribution) is Normal:
+            loc = tensor_to_array(distribution.loc)
+            scale = tensor_to_array(distribution.scale)
+            return (
+                partial(_normal_cdf, loc=loc, scale=scale, validate_args=validate_args),
+                partial(_normal_icdf, loc=loc, scale=scale),
+                partial(
+                    _normal_log_prob, loc=loc, scale=scale, validate_args=validate_args
+                ),
+            )
+        else:
+            return (
+                cls.conjugate_tensor_func(distribution.cdf),
+                cls.conjugate_tensor_func(distribution.icdf),
+                cls.conjugate_tensor_func(distribution.log_prob),
+            )
+
     @staticmethod
     def conjugate_tensor_func(
         function: Callable[
@@ -307,7 +513,8 @@ class Prior(StateDictSaveable):
         Args:
             function: callable which takes a torch tensor
         """
-        return compose(tensor_to_array, function, array_to_tensor)
+        # a partial of a module level function is a single call and stays picklable
+        return partial(_apply_to_tensor, function)
 
     @staticmethod
     def zip_apply(functions: Sequence[Callable], arguments: Sequence) -> Sequence:
@@ -365,7 +572,7 @@ class Prior(StateDictSaveable):
             name = state_dict["name"]
             module = state_dict["module"]
             kwargs = state_dict["kwargs"]
-            distribution = getattr(import_module(module), name)
+            distribution = _get_distribution_class(module, name)
             distribution = distribution(**kwargs)
             return getattr(cls, method)(distribution)
         else:
@@ -1,4 +1,4 @@
-from typing import Callable, Hashable, Optional, Sequence, Tuple
+from typing import Callable, Hashable, List, Optional, Sequence, Tuple
 from warnings import warn
 
 import numpy as np
@@ -121,7 +121,7 @@ class Dataset(torch.utils.data.Dataset, StateDictSaveable):
     @property
     def v(self) -> np.ndarray:
         """Return all parameters as (n_points, n_parameters) array."""
-        return np.array([self._store.v[i] for i in self.indices])
+        return self._store.get_parameters(self.indices)
 
     @property
     def parameter_names(self) -> ParameterNamesType:
@@ -132,7 +132,7 @@ class Dataset(torch.utils.data.Dataset, StateDictSaveable):
         """Return datastore entry."""
         i = self.indices[idx]
         x = {k: self._store.sims[k][i] for k in self._simkeys}
-        v = self._store.v[i]
+        v = self._store.get_parameters(i)
         if self._simhook is not None:
             x = self._simhook(x, v)
         u = self.prior.cdf(v.reshape(1, -1)).flatten()
@@ -143,6 +143,35 @@ class Dataset(torch.utils.data.Dataset, StateDictSaveable):
             array_to_tensor(v),
         )
 
+    def __getitems__(
+        self, idx: Sequence[int]
+    ) -> List[Tuple[ObsType, torch.Tensor, torch.Tensor]]:
+        """Return a list of datastore entries, same as ``[self[i] for i in idx]``.
+
+        .. note::
+            torch.utils.data.DataLoader fetches whole batches through this method.
+            Every store array is read with a single orthogonal selection and the
+            prior cdf is evaluated once for the batch, instead of once per entry.
+        """
+        i = np.asarray(self.indices)[np.asarray(idx, dtype=int)]
+        xs = {k: self._store.sims[k].oindex[i] for k in self._simkeys}
+        vs = self._store.get_parameters(i)
+        us = self.prior.cdf(vs)
+
+        items = []
+        for j, (u, v) in enumerate(zip(us, vs)):
+            x = {key: val[j] for key, val in xs.items()}
+            if self._simhook is not None:
+                x = self._simhook(x, v)
+            items.append(
+                (
+                    {key: array_to_tensor(val) for key, val in x.items()},
+                    array_to_tensor(u),
+                    array_to_tensor(v),
+                )
+            )
+        return items
+
     def state_dict(self) -> dict:
         return dict(
             indices=self.indices,
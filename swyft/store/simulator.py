@@ -5,6 +5,8 @@ import shlex
 import subprocess
 import tempfile
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from operator import getitem
 from typing import Callable, Mapping, Optional, Tuple, Union
 
@@ -36,9 +38,15 @@ class Simulator:
         parameter_names: List of parameter names, or number of parameters (interpreted
             as 'z0', 'z1', ...).
         sim_shapes: Dict describing model function output shapes.
-        sim_dtype: Model output data type.
+        sim_dtype: Model output data type. A lower precision type ("f4")
+            reduces the memory and bandwidth used to store and load the
+            simulations.
         fail_on_non_finite: whether return an invalid code if simulation
             returns NaN or infinite, default True
+        max_workers: if larger than one, run the model concurrently in a pool
+            of threads of the given size. This is useful for models that
+            release the GIL (e.g. compiled code or I/O). For CPU-bound Python
+            models, use the DaskSimulator instead.
 
     Examples:
 
@@ -49,6 +57,8 @@ class Simulator:
         >>> simulator = swyft.Simulator(model, ["x", "y", "z"], sim_shapes=dict(mu=(1,), nu=(2,))
     """
 
+    _batch_size = 256
+
     def __init__(
         self,
         model: ForwardModelType,
@@ -56,6 +66,7 @@ class Simulator:
         sim_shapes: ObsShapeType,
         sim_dtype: str = "f8",
         fail_on_non_finite: bool = True,
+        max_workers: int = 1,
     ) -> None:
         self.model = model
         if isinstance(parameter_names, int):
@@ -64,6 +75,7 @@ class Simulator:
         self.sim_shapes = sim_shapes
         self.sim_dtype = sim_dtype
         self.fail_on_non_finite = fail_on_non_finite
+        self.max_workers = max_workers
 
     def _run(
         self,
@@ -71,6 +83,7 @@ class Simulator:
         sims: Mapping[str, Union[zarr.indexing.OIndex, np.ndarray]],
         sim_status: Union[zarr.indexing.OIndex, np.ndarray],
         indices: np.ndarray,
+        batch_size: Optional[int] = None,
         **kwargs
     ) -> None:
         """Run the simulator on the input parameters.
@@ -90,12 +103,44 @@ class Simulator:
                 ``array[:, [1, 2, 3]] = 0``).
             indices: Indices of the samples that need to be run by the
                 simulator.
+            batch_size: simulation results are collected in memory and
+                written to the output arrays in batches of the specified size
+                (default is 256), so that finished batches are kept if the run
+                is interrupted.
         """
-        for i in indices:
-            sim, status = _run_model(v[i], self.model, self.fail_on_non_finite)
+        batch_size = batch_size or self._batch_size
+        if self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                self._run_batches(
+                    v, sims, sim_status, indices, batch_size, executor.map
+                )
+        else:
+            self._run_batches(v, sims, sim_status, indices, batch_size, map)
+
+    def _run_batches(
+        self,
+        v: Union[zarr.Array, np.ndarray],
+        sims: Mapping[str, Union[zarr.indexing.OIndex, np.ndarray]],
+        sim_status: Union[zarr.indexing.OIndex, np.ndarray],
+        indices: np.ndarray,
+        batch_size: int,
+        map_fn: Callable,
+    ) -> None:
+        """Run the model batch-wise with `map_fn` and write the results."""
+        for start in range(0, len(indices), batch_size):
+            batch = np.asarray(indices[start : start + batch_size])
+            v_batch = v.oindex[batch] if isinstance(v, zarr.Array) else v[batch]
+            sims_batch, status_batch = _run_model_chunk(
+                v_batch,
+                self.model,
+                self.sim_shapes,
+                self.fail_on_non_finite,
+                sim_dtype=self.sim_dtype,
+                map_fn=map_fn,
+            )
             for k in sims.keys():
-                sims[k][i] = sim.get(k, np.nan)
-            sim_status[i] = status
+                sims[k][batch] = sims_batch[k]
+            sim_status[batch] = status_batch
 
     @classmethod
     def from_command(
@@ -130,6 +175,10 @@ class Simulator:
             tmpdir: Root temporary directory where to run the simulator.
                 Each instance of the simulator will run in a separate
                 sub-folder. It must exist.
+
+        .. note::
+            The simulator changes the working directory of the process while
+            running, so it should not be combined with ``max_workers > 1``.
         """
         if shell:
             log.warning(
@@ -238,6 +287,7 @@ class DaskSimulator(Simulator):
             model=self.model,
             sim_shapes=self.sim_shapes,
             fail_on_non_finite=self.fail_on_non_finite,
+            sim_dtype=self.sim_dtype,
             drop_axis=1,
             dtype=object,
             meta=np.array((), dtype=object),
@@ -257,8 +307,8 @@ class DaskSimulator(Simulator):
                 obs,
                 new_axis=[i + 1 for i in range(len(shape))],
                 chunks=(v_dask.chunks[0], *shape),
-                meta=np.array(()),
-                dtype=float,
+                meta=np.array((), dtype=self.sim_dtype),
+                dtype=self.sim_dtype,
             )
 
         sources = [result_dict[k] for k in self.sim_shapes.keys()]
@@ -348,7 +398,12 @@ def _run_model(
 
 
 def _run_model_chunk(
-    v: np.ndarray, model: Callable, sim_shapes: ObsShapeType, fail_on_non_finite: bool
+    v: np.ndarray,
+    model: Callable,
+    sim_shapes: ObsShapeType,
+    fail_on_non_finite: bool,
+    sim_dtype: str = "f8",
+    map_fn: Callable = map,
 ) -> Tuple[Mapping[str, np.ndarray], np.ndarray]:
     """Run the model over a set of input parameters.
 
@@ -359,16 +414,25 @@ def _run_model_chunk(
         sim_shapes: Map of simulator's output names to shapes.
         fail_on_non_finite: Whether return an invalid code if simulation
             returns NaN or infinite, default True.
+        sim_dtype: Data type of the output arrays.
+        map_fn: Map function used to run the model over the input parameters
+            (e.g. the map method of an executor).
     Returns:
         Dictionary with the output of the simulations, array with the simulation status.
     """
     chunk_size = len(v)
-    sims = {obs: np.full((chunk_size, *shp), np.nan) for obs, shp in sim_shapes.items()}
+    fill_value = np.nan if np.dtype(sim_dtype).kind in "fc" else 0
+    sims = {
+        obs: np.full((chunk_size, *shp), fill_value, dtype=sim_dtype)
+        for obs, shp in sim_shapes.items()
+    }
     sim_status = np.zeros(len(v), dtype=int)
-    for i, z_i in enumerate(v):
-        sim, status = _run_model(z_i, model, fail_on_non_finite)
-        for key, val in sim.items():
-            sims[key][i] = val
+    runs = map_fn(
+        partial(_run_model, model=model, fail_on_non_finite=fail_on_non_finite), v
+    )
+    for i, (sim, status) in enumerate(runs):
+        for key in sims.keys() & sim.keys():
+            sims[key][i] = sim[key]
         sim_status[i] = status
     return sims, sim_status
 
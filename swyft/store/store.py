@@ -45,21 +45,41 @@ class Store:
             other dimensions).
         pickle_protocol: pickle protocol number used for storing intensity functions.
         from_scratch: if False, load the sample store from the Zarr store provided.
+        seed: seed of the random number generator used to grow and sample the
+            store. If None, the seed is drawn from numpy's global random state,
+            so that ``np.random.seed`` still makes results reproducible.
     """
 
     _filesystem = Filesystem
+    # number of samples processed at once when scanning the whole store
+    _block_size = 100_000
 
     def __init__(
         self,
         zarr_store: Union[zarr.MemoryStore, zarr.DirectoryStore],
         simulator: Optional[Simulator] = None,
         sync_path: Optional[PathType] = None,
-        chunksize: int = 1,
+        chunksize: int = 64,
         pickle_protocol: int = 4,
         from_scratch: bool = True,
+        seed: Optional[int] = None,
     ) -> None:
         self._zarr_store = zarr_store
         self._simulator = simulator
+        # zarr handles are only re-bound when the epoch changes, see `_update`
+        self._epoch = 0
+        self._bound_epoch = None
+        # other Store objects or processes may modify persistent stores
+        self._shared = sync_path is not None or not isinstance(
+            zarr_store, zarr.MemoryStore
+        )
+        # deserialized (pdf, N) intensity entries, see `_get_intensities`
+        self._intensities = []
+        # in-memory copy of the parameters, see `get_parameters`
+        self._v_in_memory = None
+        if seed is None:
+            seed = np.random.randint(2**32, dtype=np.uint64)
+        self._rng = np.random.default_rng(seed)
         self._pickle_protocol = pickle_protocol  # TODO: to be deprecated, we will default to 4, which is supported since python 3.4
 
         synchronizer = zarr.ProcessSynchronizer(sync_path) if sync_path else None
@@ -111,25 +131,26 @@ class Store:
 
         # Lock store while adding new points
         self.lock()
-        self._update()
+        self._update(force=True)
 
         # Generate new points
-        v_prop = pdf.sample(np.random.poisson(N))
-        log_lambda_target = pdf.log_prob(v_prop) + np.log(N)
+        v_prop, u_prop = pdf.sample_with_u(self._rng.poisson(N), rng=self._rng)
+        log_lambda_target = pdf.log_prob(v_prop, u_prop) + np.log(N)
         log_lambda_store = self.log_lambda(v_prop)
-        log_w = np.log(np.random.rand(len(v_prop))) + log_lambda_target
+        # log(U) ~ -Exponential(1) for U ~ Uniform(0, 1)
+        log_w = log_lambda_target - self._rng.standard_exponential(len(v_prop))
         accept_new = log_w > log_lambda_store
-        v_new = v_prop[accept_new]
-        log_w_new = log_w[accept_new]
+        n_new = np.count_nonzero(accept_new)
 
         # Anything new?
-        if sum(accept_new) > 0:
+        if n_new > 0:
             # Add new entries to store
-            self._append_new_points(v_new, log_w_new)
-            print("Store: Adding %i new samples to simulator store." % sum(accept_new))
+            self._append_new_points(v_prop[accept_new], log_w[accept_new])
+            print("Store: Adding %i new samples to simulator store." % n_new)
             # Update intensity function
             self.log_lambdas.resize(len(self.log_lambdas) + 1)
             self.log_lambdas[-1] = dict(pdf=pdf.state_dict(), N=N)
+            self._epoch += 1
 
         log.debug(f"  total size of simulator store {len(self)}.")
 
@@ -164,7 +185,7 @@ class Store:
         parameter_names: ParameterNamesType,
         sim_shapes: ObsShapeType,
         root: zarr.Group,
-        chunksize: int = 1,
+        chunksize: int = 64,
         sim_dtype: str = "f8",
     ) -> None:  # Adding observational shapes to store
         # Parameters
@@ -195,36 +216,58 @@ class Store:
             object_codec=numcodecs.Pickle(protocol=self._pickle_protocol),
         )
 
-        # Simulation status code
+        # Simulation status code (SimulationStatus values fit in a single byte)
         root.zeros(
             self._filesystem.simulation_status,
             shape=(0,),
             chunks=(chunksize,),
-            dtype="int",
+            dtype="u1",
         )
 
+        self._epoch += 1
         self._update()
 
-    def _update(self) -> None:
-        self.sims = self._root[self._filesystem.sims]
-        self.v = self._root[self._filesystem.v]
-        self.log_w = self._root[self._filesystem.log_w]
-        self.log_lambdas = self._root[self._filesystem.log_lambdas]
-        self.sim_status = self._root[self._filesystem.simulation_status]
-        self.parameter_names = self._root[self._filesystem.v].attrs["parameter_names"]
+    def _update(self, force: bool = False) -> None:
+        """Re-bind the zarr array handles.
+
+        Handles of a MemoryStore are only re-bound if the store was modified
+        through this object since the last call, or if `force` is True.
+        Persistent or synchronized stores can be modified by other Store
+        objects or processes, so their handles, and thus the array metadata,
+        are always re-read.
+        """
+        if not force and not self._shared and self._bound_epoch == self._epoch:
+            return
+        self._bound_epoch = self._epoch
+        fs = self._filesystem
+        self.sims = self._root[fs.sims]
+        self.v = self._root[fs.v]
+        self.log_w = self._root[fs.log_w]
+        self.log_lambdas = self._root[fs.log_lambdas]
+        self.sim_status = self._root[fs.simulation_status]
+        self.parameter_names = self.v.attrs["parameter_names"]
 
     def __len__(self) -> int:
         """Returns number of samples in the store."""
         self._update()
         return len(self.v)
 
-    def __getitem__(self, i: int) -> Tuple[Mapping[str, np.ndarray], np.ndarray]:
-        """Returns data store entry with index :math:`i`."""
+    def __getitem__(
+        self, i: Union[int, Sequence[int]]
+    ) -> Tuple[Mapping[str, np.ndarray], np.ndarray]:
+        """Returns data store entry with index :math:`i`.
+
+        If :math:`i` is a sequence of indices, the entries are fetched with a
+        single orthogonal selection per array, instead of one zarr read per
+        index.
+        """
         self._update()
-        sim = {}
-        for key, value in self.sims.items():
-            sim[key] = value[i]
-        par = self.v[i]
+        if np.ndim(i) == 0:
+            sim = {key: value[i] for key, value in self.sims.items()}
+        else:
+            i = np.asarray(i, dtype=int)
+            sim = {key: value.oindex[i] for key, value in self.sims.items()}
+        par = self.get_parameters(i)
         return (sim, par)
 
     def _append_new_points(self, v: Array, log_w: Array) -> None:
@@ -236,10 +279,11 @@ class Store:
             shape[0] += n
             value.resize(*shape)
 
-        self._root[self._filesystem.v].append(v)
-        self._root[self._filesystem.log_w].append(log_w)
-        m = np.full(n, SimulationStatus.PENDING, dtype="int")
+        self.v.append(v)
+        self.log_w.append(log_w)
+        m = np.full(n, SimulationStatus.PENDING, dtype=self.sim_status.dtype)
         self.sim_status.append(m)
+        self._epoch += 1
 
     def log_lambda(self, z: np.ndarray) -> np.ndarray:
         """Intensity function of the store.
@@ -251,17 +295,33 @@ class Store:
         Returns:
             Array with the sample intensities.
         """
-        self._update()
-        d = -np.inf * np.ones_like(z[:, 0])
-        if len(self.log_lambdas) == 0:
-            return d
-        for i in range(len(self.log_lambdas)):
-            pdf = swyft.PriorTruncator.from_state_dict(self.log_lambdas[i]["pdf"])
-            N = self.log_lambdas[i]["N"]
+        intensities = self._get_intensities()
+        if not intensities:
+            return np.full(len(z), -np.inf)
+        # start from the first entry, a single entry needs no reduction
+        pdf, N = intensities[0]
+        d = pdf.log_prob(z) + np.log(N)
+        for pdf, N in intensities[1:]:
             r = pdf.log_prob(z) + np.log(N)
-            d = np.where(r > d, r, d)
+            np.fmax(d, r, out=d)
         return d
 
+    def _get_intensities(self) -> Sequence[Tuple["swyft.PriorTruncator", int]]:
+        """Return the deserialized intensity entries of the store.
+
+        Unpickling and rebuilding the truncated priors is expensive, so the
+        entries are cached and only new ones are read from the store. The
+        handles are re-bound first, so that entries appended by other Store
+        objects or processes are not missed.
+        """
+        self._update(force=True)
+        n_cached = len(self._intensities)
+        if len(self.log_lambdas) > n_cached:
+            for entry in self.log_lambdas[n_cached:]:
+                pdf = swyft.PriorTruncator.from_state_dict(entry["pdf"])
+                self._intensities.append((pdf, entry["N"]))
+        return self._intensities
+
     def coverage(
         self, N: int, prior: "swyft.Prior", bound: Optional["swyft.Bound"] = None
     ) -> float:
@@ -285,11 +345,11 @@ class Store:
         """
         pdf = swyft.PriorTruncator(prior, bound)
         Nsamples = max(N, 1000)  # At least 1000 test samples
-        self._update()
+        self._update(force=True)
 
         # Generate new points
-        v_prop = pdf.sample(np.random.poisson(Nsamples))
-        log_lambda_target = pdf.log_prob(v_prop) + np.log(N)
+        v_prop, u_prop = pdf.sample_with_u(self._rng.poisson(Nsamples), rng=self._rng)
+        log_lambda_target = pdf.log_prob(v_prop, u_prop) + np.log(N)
         log_lambda_store = self.log_lambda(v_prop)
         frac = np.where(
             log_lambda_target > log_lambda_store,
@@ -313,31 +373,34 @@ class Store:
             prior: Prior
             bound: Bound object for prior truncation
             check_coverage: Check whether requested points are contained in the store.
+                Not needed when `add` is True, since the store then covers the requested points.
             add: If necessary, add requested points to the store.
 
         Returns:
             Indices: Index list pointing to the relevant store entries.
         """
         if add:
-            if self.coverage(N, prior, bound=bound) < 1:
-                self.add(N, prior, bound=bound)
-        if check_coverage:
+            # Store.add only adds the points that are not yet covered
+            self.add(N, prior, bound=bound)
+        elif check_coverage:
             if self.coverage(N, prior, bound=bound) < 1.0:
                 raise RuntimeError(
                     "Store does not contain enough samples for your requested intensity function `N * prior`."
                 )
         pdf = swyft.PriorTruncator(prior, bound)
 
-        self._update()
+        self._update(force=True)
 
-        # Select points from cache
-        v_store = self.v[:]
-        log_w_store = self.log_w[:]
-        log_lambda_target = pdf.log_prob(v_store) + np.log(N)
-        accept_stored = log_w_store <= log_lambda_target
-        indices = np.array(range(len(accept_stored)))[accept_stored]
+        # Select points from cache, block-wise to bound the memory usage
+        v = self.get_parameters()
+        indices = [np.empty(0, dtype=int)]
+        for start in range(0, len(v), self._block_size):
+            stop = start + self._block_size
+            log_lambda_target = pdf.log_prob(v[start:stop]) + np.log(N)
+            accept_stored = self.log_w[start:stop] <= log_lambda_target
+            indices.append(start + np.flatnonzero(accept_stored))
 
-        return indices
+        return np.concatenate(indices)
 
     def _get_indices_to_simulate(
         self, indices: Optional[Sequence[int]] = None
@@ -355,10 +418,22 @@ class Store:
         status = self.get_simulation_status(indices)
         require_simulation = status == SimulationStatus.PENDING
         idx = np.flatnonzero(require_simulation)
-        return indices[idx] if indices is not None else idx
+        return np.asarray(indices)[idx] if indices is not None else idx
+
+    @staticmethod
+    def _as_slice(indices: Sequence[int]) -> Optional[slice]:
+        """Return an equivalent slice if indices is a contiguous increasing range, else None."""
+        indices = np.asarray(indices)
+        if indices.ndim != 1 or indices.size == 0:
+            return None
+        if indices[-1] - indices[0] + 1 == indices.size and np.all(
+            np.diff(indices) == 1
+        ):
+            return slice(int(indices[0]), int(indices[-1]) + 1)
+        return None
 
     def _set_simulation_status(
-        self, indices: Sequence[int], status: SimulationStatus
+        self, indices: Sequence[int], status: SimulationStatus, check: bool = True
     ) -> None:
         """
         Flag the specified samples with the simulation status.
@@ -366,14 +441,46 @@ class Store:
         Args:
             indices: array with the indices of the samples to flag
             status: new status for the samples
+            check: warn if some samples already have this status. Requires reading the current status.
         """
         assert status in list(SimulationStatus), f"Unknown status {status}"
-        current_status = self.sim_status.oindex[indices]
-        if np.any(current_status == status):
-            log.warning(
-                f"Changing simulation status to {status}, but some simulations have already status {status}"
-            )
-        self.sim_status.oindex[indices] = status
+        # basic slicing is cheaper than orthogonal indexing in zarr
+        selection = self._as_slice(indices)
+        array = self.sim_status if selection is not None else self.sim_status.oindex
+        selection = selection if selection is not None else indices
+        if check:
+            current_status = array[selection]
+            if np.any(current_status == status):
+                log.warning(
+                    f"Changing simulation status to {status}, but some simulations have already status {status}"
+                )
+        array[selection] = status
+
+    def get_parameters(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Return the parameters of the samples.
+
+        Args:
+            indices: List of indices. If None, return the parameters of all
+                samples
+
+        Returns:
+            array with the sample parameters
+
+        .. note::
+            Parameters are never modified once added to the store, so they are
+            read from zarr once and kept in memory until the store grows,
+            through this or any other Store object or process. The cache is
+            read-only, and single rows are returned as copies, so that callers
+            cannot corrupt it in place. The simulation status is not cached,
+            since simulators update it concurrently.
+        """
+        self._update()
+        if self._v_in_memory is None or len(self._v_in_memory) != len(self.v):
+            self._v_in_memory = self.v[:]
+            self._v_in_memory.setflags(write=False)
+        if indices is None:
+            return self._v_in_memory
+        return self._v_in_memory[indices].copy()
 
     def get_simulation_status(
         self, indices: Optional[Sequence[int]] = None
@@ -403,12 +510,12 @@ class Store:
         Returns:
             True if one or more samples require simulations, False otherwise.
         """
-        self._update()
-        return self._get_indices_to_simulate(indices).size > 0
+        status = self.get_simulation_status(indices)
+        return bool(np.any(status == SimulationStatus.PENDING))
 
     def _get_indices_failed_simulations(self) -> np.ndarray:
         self._update()
-        return np.flatnonzero(self.sim_status == SimulationStatus.FAILED)
+        return np.flatnonzero(self.sim_status[:] == SimulationStatus.FAILED)
 
     @property
     def any_failed(self) -> bool:
@@ -453,9 +560,10 @@ class Store:
             return
 
         self.lock()
-        self._update()
+        self._update(force=True)
         idx = self._get_indices_to_simulate(indices)
-        self._set_simulation_status(idx, SimulationStatus.RUNNING)
+        # idx was just selected because its status is PENDING
+        self._set_simulation_status(idx, SimulationStatus.RUNNING, check=False)
         self.unlock()
 
         # Run simulations and collect status
@@ -490,12 +598,16 @@ class Store:
         Args:
             indices: list of sample indices
         """
-        done = False
-        while not done:
-            time.sleep(1)
+        # Check before sleeping, then poll with a backoff capped at one second,
+        # so that finished (e.g. in-memory) simulations do not wait a full tick.
+        delay = 0.01
+        while True:
             status = self.get_simulation_status(indices)
             done = np.isin(status, [SimulationStatus.FINISHED, SimulationStatus.FAILED])
-            done = np.all(done)
+            if np.all(done):
+                return
+            time.sleep(delay)
+            delay = min(2 * delay, 1.0)
 
     @classmethod
     def directory_store(
@@ -504,6 +616,8 @@ class Store:
         simulator: Optional[Simulator] = None,
         sync_path: Optional[PathType] = None,
         overwrite: bool = False,
+        chunksize: int = 64,
+        seed: Optional[int] = None,
     ) -> "Store":
         """Instantiate a new Store based on a Zarr DirectoryStore.
 
@@ -514,6 +628,8 @@ class Store:
                 It must differ from path, it must be accessible to all processes working on the store,
                 and the underlying filesystem must support file locking.
             overwrite: if True, and a store already exists at the specified path, overwrite it.
+            chunksize: number of samples per chunk of the stored arrays.
+            seed: seed of the random number generator of the store.
 
         Returns:
             Store based on a Zarr DirectoryStore
@@ -528,7 +644,9 @@ class Store:
                 zarr_store=zarr_store,
                 simulator=simulator,
                 sync_path=sync_path,
+                chunksize=chunksize,
                 from_scratch=True,
+                seed=seed,
             )
         else:
             raise FileExistsError(
@@ -536,11 +654,15 @@ class Store:
             )
 
     @classmethod
-    def memory_store(cls, simulator: Simulator) -> "Store":
+    def memory_store(
+        cls, simulator: Simulator, chunksize: int = 64, seed: Optional[int] = None
+    ) -> "Store":
         """Instantiate a new Store based on a Zarr MemoryStore.
 
         Args:
             simulator: simulator object
+            chunksize: number of samples per chunk of the stored arrays.
+            seed: seed of the random number generator of the store.
 
         Returns:
             Store based on a Zarr MemoryStore
@@ -554,7 +676,13 @@ class Store:
             >>> store = swyft.Store.memory_store(simulator)
         """
         zarr_store = zarr.MemoryStore()
-        return cls(zarr_store=zarr_store, simulator=simulator, from_scratch=True)
+        return cls(
+            zarr_store=zarr_store,
+            simulator=simulator,
+            chunksize=chunksize,
+            from_scratch=True,
+            seed=seed,
+        )
 
     def save(self, path: PathType) -> None:
         """Save the Store to disk using a Zarr DirectoryStore.
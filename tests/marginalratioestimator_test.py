@@ -11,6 +11,10 @@ import swyft.networks.classifier as classifier
 from swyft.types import MarginalIndex
 from swyft.utils.marginals import tupleize_marginal_indices
 
+requires_autocast = pytest.mark.skipif(
+    not hasattr(torch, "autocast"), reason="torch.autocast requires torch >= 1.10"
+)
+
 
 class TestSplitLengthByPercentage:
     def test_sum_to_1(self):
@@ -57,6 +61,60 @@ def test_double_observation():
     assert torch.all(mre.double_observation(a) == truth)
 
 
+def test_loss_matches_separate_logsigmoid_terms():
+    n_batch, n_marginals = 4, 3
+    lnL = torch.randn(2 * n_batch, n_marginals)
+
+    class FixedNetwork(torch.nn.Module):
+        def head(self, observation):
+            return observation["x"]
+
+        def tail(self, features, parameters):
+            assert features.size(0) == parameters.size(0) == 2 * n_batch
+            return lnL
+
+    estimator = mre.MarginalRatioEstimator([0, 1, 2], FixedNetwork(), "cpu")
+    loss = estimator._loss({"x": torch.rand(n_batch, 2)}, torch.rand(n_batch, 3))
+
+    logsigmoid = torch.nn.functional.logsigmoid
+    lnL = lnL.view(-1, 4, n_marginals)
+    expected = (
+        -(
+            logsigmoid(lnL[:, 0])
+            + logsigmoid(-lnL[:, 1])
+            + logsigmoid(-lnL[:, 2])
+            + logsigmoid(lnL[:, 3])
+        ).sum(dim=0)
+        / n_batch
+    )
+    assert torch.allclose(loss, expected)
+
+
+def test_loss_runs_head_on_undoubled_observation():
+    n_batch = 4
+    network = classifier.get_marginal_classifier(
+        observation_key="x",
+        marginal_indices=[0, 1],
+        observation_shapes={"x": (3,)},
+        n_parameters=2,
+        hidden_features=8,
+        num_blocks=1,
+    )
+    estimator = mre.MarginalRatioEstimator([0, 1], network, "cpu")
+    observation = {"x": torch.rand(n_batch, 3)}
+    parameters = torch.rand(n_batch, 2)
+    network.eval()
+    loss = estimator._loss(observation, parameters)
+
+    lnL = network(
+        {"x": mre.double_observation(observation["x"])},
+        mre.double_parameters(parameters),
+    ).view(-1, 4, 2)
+    signs = torch.tensor([1.0, -1.0, -1.0, 1.0]).view(1, 4, 1)
+    expected = -torch.nn.functional.logsigmoid(lnL * signs).sum(dim=(0, 1)) / n_batch
+    assert torch.allclose(loss, expected)
+
+
 class TestDoubleParameters:
     def test_assertion(self):
         with pytest.raises(AssertionError):
@@ -162,6 +220,43 @@ class TestMarginalRatioEstimator:
     def test_train(self):
         raise NotImplementedError("Need to test this function.")
 
+    @pytest.mark.parametrize(
+        "autocast_dtype", [None, pytest.param(torch.bfloat16, marks=requires_autocast)]
+    )
+    def test_train_autocast(self, autocast_dtype: Optional[torch.dtype]):
+        n_samples = 100
+        v = torch.rand(n_samples, self.n_parameters)
+        observations = torch.rand(n_samples, *self.observation_shapes["x"])
+        dataset = [({self.observation_key: o}, p, p) for o, p in zip(observations, v)]
+        marginal_ratio_estimator = self.get_marginal_ratio_estimator([0, 1])
+        validation_losses = marginal_ratio_estimator.train(
+            dataset,
+            batch_size=10,
+            max_epochs=2,
+            pin_memory=False,
+            autocast_dtype=autocast_dtype,
+        )
+        assert len(validation_losses) == 2
+        assert all(torch.isfinite(loss) for loss in validation_losses)
+
+    def test_train_keeps_copy_of_best_network(self):
+        n_samples = 100
+        v = torch.rand(n_samples, self.n_parameters)
+        observations = torch.rand(n_samples, *self.observation_shapes["x"])
+        dataset = [({self.observation_key: o}, p, p) for o, p in zip(observations, v)]
+        marginal_ratio_estimator = self.get_marginal_ratio_estimator([0, 1])
+        marginal_ratio_estimator.train(
+            dataset, batch_size=10, max_epochs=2, pin_memory=False
+        )
+        best = marginal_ratio_estimator.best_network_state_dict
+        assert best is not None
+        snapshot = {key: value.clone() for key, value in best.items()}
+        with torch.no_grad():
+            for parameter in marginal_ratio_estimator.network.parameters():
+                parameter.add_(1.0)
+        for key, value in best.items():
+            assert torch.equal(value, snapshot[key])
+
     @pytest.mark.parametrize(
         "marginal_indices, batch_size",
         product(
@@ -189,6 +284,45 @@ class TestMarginalRatioEstimator:
         for _, value in log_ratio.items():
             assert value.shape == (n_batch,)
 
+    @requires_autocast
+    def test_log_ratio_autocast(self):
+        torch.manual_seed(0)
+        marginal_indices = tupleize_marginal_indices([0, 1])
+        marginal_ratio_estimator = self.get_marginal_ratio_estimator(marginal_indices)
+        fabricated_observation = {
+            key: torch.rand(*shape) for key, shape in self.observation_shapes.items()
+        }
+        fabricated_v = torch.randn(100, self.n_parameters)
+        full = marginal_ratio_estimator.log_ratio(fabricated_observation, fabricated_v)
+        reduced = marginal_ratio_estimator.log_ratio(
+            fabricated_observation, fabricated_v, autocast_dtype=torch.bfloat16
+        )
+        for marginal_index in marginal_indices:
+            assert reduced[marginal_index].dtype == full[marginal_index].dtype
+            reference = torch.as_tensor(full[marginal_index])
+            error = torch.as_tensor(reduced[marginal_index]) - reference
+            assert error.abs().max() <= 0.05 * reference.abs().max()
+
+    def test_log_ratio_batched_matches_unbatched(self):
+        marginal_indices = tupleize_marginal_indices([0, 1])
+        marginal_ratio_estimator = self.get_marginal_ratio_estimator(marginal_indices)
+        fabricated_observation = {
+            key: torch.rand(*shape) for key, shape in self.observation_shapes.items()
+        }
+        fabricated_v = torch.randn(100, self.n_parameters)
+        unbatched = marginal_ratio_estimator.log_ratio(
+            fabricated_observation, fabricated_v
+        )
+        batched = marginal_ratio_estimator.log_ratio(
+            fabricated_observation, fabricated_v, batch_size=30
+        )
+        for marginal_index in marginal_indices:
+            assert torch.allclose(
+                torch.as_tensor(batched[marginal_index]),
+                torch.as_tensor(unbatched[marginal_index]),
+                atol=1e-6,
+            )
+
 
 if __name__ == "__main__":
     pass
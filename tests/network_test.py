@@ -3,6 +3,8 @@ from itertools import product
 import pytest
 import torch
 
+from swyft.networks.channelized import LinearWithChannel
+from swyft.networks.classifier import MarginalClassifier, ParameterTransform
 from swyft.networks.standardization import OnlineStandardizingLayer
 
 
@@ -81,5 +83,58 @@ class TestStandardizationLayer:
             assert torch.allclose(osl.std, data.std(0).mean())
 
 
+class TestLinearWithChannel:
+    @pytest.mark.parametrize("batch_shape", [(), (4,), (4, 3)])
+    def test_forward_matches_per_channel_linear(self, batch_shape):
+        torch.manual_seed(0)
+        channels, in_features, out_features = 3, 5, 2
+        layer = LinearWithChannel(channels, in_features, out_features)
+        x = torch.randn(*batch_shape, channels, in_features)
+        expected = torch.stack(
+            [
+                torch.nn.functional.linear(
+                    x[..., c, :], layer.weights[c], layer.bias[c]
+                )
+                for c in range(channels)
+            ],
+            dim=-2,
+        )
+        assert torch.allclose(layer(x), expected, atol=1e-6)
+
+
+class TestParameterTransform:
+    @pytest.mark.parametrize("marginal_indices", [[0, 1, 3], [(0, 1), (2, 3)], 2])
+    def test_forward_gathers_marginal_block(self, marginal_indices):
+        parameters = torch.randn(6, 4)
+        transform = ParameterTransform(4, marginal_indices, online_z_score=False)
+        expected = torch.stack(
+            [parameters[..., list(mi)] for mi in transform.marginal_indices.tolist()],
+            dim=1,
+        )
+        assert torch.equal(transform(parameters), expected)
+        assert torch.equal(
+            ParameterTransform.get_marginal_block(parameters, marginal_indices),
+            expected,
+        )
+
+
+class TestMarginalClassifier:
+    @pytest.mark.parametrize("n_marginals, n_block_parameters", [(1, 1), (3, 2)])
+    def test_forward_matches_concatenated_input(self, n_marginals, n_block_parameters):
+        torch.manual_seed(0)
+        n_batch, n_features = 5, 7
+        classifier = MarginalClassifier(
+            n_marginals, n_features + n_block_parameters, 16, 2
+        ).eval()
+        features = torch.randn(n_batch, n_features)
+        marginal_block = torch.randn(n_batch, n_marginals, n_block_parameters)
+
+        expanded = features.unsqueeze(1).expand(-1, n_marginals, -1)
+        combined = torch.cat([expanded, marginal_block], dim=2)
+        expected = classifier.net(combined).squeeze(-1)
+
+        assert torch.allclose(classifier(features, marginal_block), expected, atol=1e-6)
+
+
 if __name__ == "__main__":
     pass
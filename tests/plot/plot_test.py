@@ -0,0 +1,12 @@
+import numpy as np
+
+from swyft.plot.plot import grid_interpolate_samples
+
+
+class TestPlot:
+    def test_grid_interpolate_samples_is_normalized(self) -> None:
+        x = np.random.default_rng(0).uniform(-8.0, 8.0, 1_000)
+        y = np.exp(-(x**2) / 2)
+        x_grid, y_grid, norm = grid_interpolate_samples(x, y, return_norm=True)
+        assert np.isclose(norm, np.sqrt(2 * np.pi), rtol=1e-3)
+        assert np.isclose(y_grid.max(), 1 / np.sqrt(2 * np.pi), rtol=1e-3)
@@ -12,7 +12,12 @@ from scipy.stats._distn_infrastructure import rv_frozen
 from toolz import compose
 from torch.distributions import Normal, Uniform
 
-from swyft.prior import InterpolatedTabulatedDistribution, Prior, PriorTruncator
+from swyft.prior import (
+    InterpolatedTabulatedDistribution,
+    Prior,
+    PriorTruncator,
+    _grid_bracket,
+)
 from swyft.utils import array_to_tensor, tensor_to_array
 
 dimensions = [1, 2, 5]
@@ -87,6 +92,72 @@ class TestInterpolatedTabulatedDistribution:
         elif isinstance(distribution, Normal):
             assert np.allclose(samples, samples_itd, atol=1e-1, rtol=1e-1)
 
+    @pytest.mark.parametrize(
+        "distribution, args",
+        chain(
+            product([Uniform], uniform_hyperparameters),
+            product([Normal], normal_hyperparameters),
+        ),
+    )
+    def test_icdf_matches_columnwise_interp(
+        self, distribution: Callable, args: Tuple[torch.Tensor, ...]
+    ) -> None:
+        distribution = distribution(*args)
+        n_parameters = distribution.batch_shape.numel()
+        itd = InterpolatedTabulatedDistribution(
+            compose(tensor_to_array, distribution.icdf, array_to_tensor),
+            n_parameters,
+            n_grid_points=1_000,
+        )
+        u = np.random.rand(self.n, n_parameters)
+        u[:3] = [[0.0], [1.0], [1e-5]]
+        u[3, 0], u[4, -1] = -0.1, 1.1
+
+        expected = np.stack(
+            [
+                np.interp(u[:, i], itd._grid, itd._table[i], left=np.inf, right=np.inf)
+                for i in range(n_parameters)
+            ],
+            axis=1,
+        )
+        assert np.allclose(itd.icdf(u), expected, rtol=1e-8, atol=1e-8)
+
+    def test_uniform_grid_bracket_matches_bisection(self) -> None:
+        grid = np.linspace(0, 1.0, 101)
+        x = np.random.rand(self.n, 3)
+        x[0] = [-0.5, 1.0, 2.0]
+        k = _grid_bracket(x, grid, uniform=True)
+        assert np.array_equal(k, _grid_bracket(x, grid))
+        assert np.all((grid[k[1:]] <= x[1:]) & (x[1:] <= grid[k[1:] + 1]))
+
+    def test_log_prob_is_inverse_table_slope(self) -> None:
+        distribution = Uniform(-2 * torch.ones(2), torch.tensor([-1.0, 3.0]))
+        itd = InterpolatedTabulatedDistribution(
+            compose(tensor_to_array, distribution.icdf, array_to_tensor),
+            2,
+            n_grid_points=1_000,
+        )
+        v = tensor_to_array(distribution.sample((self.n,)))
+        expected = tensor_to_array(distribution.log_prob(array_to_tensor(v)))
+        assert np.allclose(itd.log_prob(v), expected, atol=1e-3)
+        assert np.all(itd.log_prob(np.array([[-3.0, 0.0]]))[:, 0] == -np.inf)
+
+    def test_log_prob_flat_table_is_finite(self) -> None:
+        itd = InterpolatedTabulatedDistribution(
+            lambda u: np.clip(u, 0.25, 0.75), 1, n_grid_points=101
+        )
+        log_prob = itd.log_prob(np.array([[0.25], [0.5], [0.75]]))
+        assert np.all(np.isfinite(log_prob))
+        assert np.all(log_prob <= itd._flat_segment_log_prob)
+        assert np.isclose(log_prob[1, 0], 0.0)
+
+    def test_log_prob_du_is_deprecated(self) -> None:
+        itd = InterpolatedTabulatedDistribution(lambda u: u, 1, n_grid_points=101)
+        v = np.array([[0.5]])
+        with pytest.warns(DeprecationWarning):
+            log_prob = itd.log_prob(v, du=1e-6)
+        assert np.allclose(log_prob, itd.log_prob(v))
+
 
 class TestPrior:
     def setup_method(self, method):
@@ -105,7 +176,8 @@ class TestPrior:
     ) -> None:
         distribution = distribution(*args)
         samples = distribution.sample((self.n,))
-        hypercube_samples_true = distribution.cdf(samples).numpy()
+        # single precision torch loses accuracy in the tails of the Normal cdf
+        hypercube_samples_true = distribution.cdf(samples.double()).numpy()
 
         prior = Prior.from_torch_distribution(distribution)
         hypercube_samples_esti = prior.cdf(samples)
@@ -133,6 +205,44 @@ class TestPrior:
         elif isinstance(distribution, Normal):
             assert np.allclose(samples_true, samples_esti, atol=1e-4, rtol=5e-3)
 
+    @pytest.mark.parametrize(
+        "distribution, args",
+        chain(
+            product([Uniform], uniform_hyperparameters),
+            product([Normal], normal_hyperparameters),
+        ),
+    )
+    def test_log_prob_from_torch_distribution(
+        self, distribution: Callable, args: Tuple[torch.Tensor, ...]
+    ) -> None:
+        distribution = distribution(*args)
+        samples = distribution.sample((self.n,)).double()
+        log_prob_true = distribution.log_prob(samples).numpy()
+
+        prior = Prior.from_torch_distribution(distribution)
+        assert np.allclose(log_prob_true, prior.log_prob(samples), atol=1e-5)
+
+    def test_uniform_from_torch_distribution_validates_support(self) -> None:
+        prior = Prior.from_torch_distribution(Uniform(torch.zeros(2), torch.ones(2)))
+        with pytest.raises(ValueError):
+            prior.cdf(np.array([[0.5, 2.0]]))
+        with pytest.raises(ValueError):
+            prior.log_prob(np.array([[-1.0, 0.5]]))
+
+        prior = Prior.from_torch_distribution(
+            Uniform(torch.zeros(2), torch.ones(2), validate_args=False)
+        )
+        assert np.allclose(prior.cdf(np.array([[0.5, 2.0]])), [[0.5, 1.0]])
+
+    def test_conjugate_tensor_func_does_not_alias_input(self) -> None:
+        array = np.random.rand(10, 2).astype(np.float32)
+        out = Prior.conjugate_tensor_func(lambda x: x)(array)
+        assert np.array_equal(out, array)
+        assert not np.shares_memory(out, array)
+
+        out = Prior.conjugate_tensor_func(torch.exp)(array)
+        assert np.allclose(out, np.exp(array))
+
 
 distributions = [
     (stats.norm(loc=0, scale=1),),
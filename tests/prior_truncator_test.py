@@ -57,5 +57,30 @@ class TestSaveLoadPriorTruncator:
         assert np.allclose(log_prob_true, log_prob_esti)
 
 
+class TestPriorTruncatorLogProb:
+    def test_log_prob_outside_bound_is_minus_inf(self):
+        prior = get_diagonal_normal_prior(loc=np.zeros(2), scale=np.ones(2))
+        bound = RectangleBound(np.array([[0.25, 0.75], [0.0, 1.0]]))
+        prior_truncator = PriorTruncator(prior, bound)
+        v = np.random.randn(1_000, 2)
+
+        log_prob = prior_truncator.log_prob(v)
+
+        inside = bound(prior.cdf(v))
+        assert np.all(log_prob[~inside] == -np.inf)
+        expected = prior.log_prob(v[inside]).sum(axis=-1) - np.log(bound.volume)
+        assert np.allclose(log_prob[inside], expected)
+
+    @pytest.mark.parametrize(
+        "bound", [None, RectangleBound(np.array([[0.25, 0.75], [0.0, 0.5]]))]
+    )
+    def test_log_prob_with_sampled_u(self, bound):
+        prior = get_uniform_prior(low=-1 * np.ones(2), high=2 * np.ones(2))
+        prior_truncator = PriorTruncator(prior, bound)
+        v, u = prior_truncator.sample_with_u(1_000)
+        assert np.allclose(prior.cdf(v), u)
+        assert np.allclose(prior_truncator.log_prob(v, u), prior_truncator.log_prob(v))
+
+
 if __name__ == "__main__":
     pass
@@ -61,6 +61,25 @@ class TestSimulator(unittest.TestCase):
         assert np.all(sim_status == SimulationStatus.FINISHED)
         assert not np.all(np.isclose(sims["x"].sum(axis=1), 0.0))
 
+    def test_run_simulator_with_threads(self):
+        simulator = Simulator(
+            model, sim_shapes=dict(x=(10,)), parameter_names=2, max_workers=4
+        )
+        pars = np.random.random((100, 2))
+        sims = dict(x=np.zeros((100, 10)))
+        sim_status = np.full(100, SimulationStatus.RUNNING, dtype=int)
+
+        simulator._run(
+            v=pars,
+            sims=sims,
+            sim_status=sim_status,
+            indices=np.arange(100, dtype=int),
+            batch_size=30,
+        )
+
+        assert np.all(sim_status == SimulationStatus.FINISHED)
+        assert np.allclose(sims["x"], [model(p)["x"] for p in pars])
+
     def test_run_simulator_fail_on_wrong_sim_shape(self):
         simulator = Simulator(model, sim_shapes=dict(x=(11,)), parameter_names=2)
         pars = np.random.random((100, 2))
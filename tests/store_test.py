@@ -3,10 +3,12 @@ from pathlib import Path
 
 import numpy as np
 import pytest
+import torch
 import zarr
 from dask.distributed import LocalCluster
 
 from swyft.prior import get_uniform_prior
+from swyft.store.dataset import Dataset
 from swyft.store.simulator import DaskSimulator, SimulationStatus, Simulator
 from swyft.store.store import Store
 
@@ -138,6 +140,40 @@ class TestStoreIO:
             assert loaded._zarr_store.path == store._zarr_store.path
             assert loaded.sims.keys() == store.sims.keys()
 
+    def test_directory_store_sees_growth_from_other_store(self):
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td) / "store.zarr"
+            store = Store.directory_store(simulator=sim, path=td_path)
+            store.add(100, prior)
+            loaded = Store.load(td_path)
+            assert len(loaded) == len(store)
+            store.add(1000, prior)
+            assert len(loaded) == len(store)
+            assert len(loaded.get_simulation_status()) == len(store)
+
+    def test_directory_store_log_lambda_sees_other_store(self):
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td) / "store.zarr"
+            store = Store.directory_store(simulator=sim, path=td_path)
+            store.add(100, prior)
+            loaded = Store.load(td_path)
+            z = np.random.rand(10, 2) * np.array([1.0, 0.5])
+            assert np.allclose(loaded.log_lambda(z), store.log_lambda(z))
+            store.add(1000, prior)
+            assert np.allclose(loaded.log_lambda(z), store.log_lambda(z))
+
+    def test_directory_store_parameters_see_other_store(self):
+        with tempfile.TemporaryDirectory() as td:
+            td_path = Path(td) / "store.zarr"
+            store = Store.directory_store(simulator=sim, path=td_path)
+            store.add(100, prior)
+            loaded = Store.load(td_path)
+            assert np.array_equal(loaded.get_parameters(), store.v[:])
+            store.add(1000, prior)
+            assert np.array_equal(loaded.get_parameters(), store.v[:])
+            indices = loaded.sample(1000, prior)
+            assert np.array_equal(loaded[indices][1], store.v.oindex[indices])
+
     def test_directory_store_load_store_from_wrong_paths(self):
         with tempfile.TemporaryDirectory() as td:
             with pytest.raises(KeyError):
@@ -163,6 +199,90 @@ class TestStoreRun:
         store.add(20, prior)
         assert store.sims.x1.shape[0] > 0
 
+    def test_store_add_seed(self):
+        store_a = Store.memory_store(simulator=sim, seed=42)
+        store_b = Store.memory_store(simulator=sim, seed=42)
+        store_a.add(20, prior)
+        np.random.rand(10)  # advancing the global random state must not matter
+        store_b.add(20, prior)
+        assert np.array_equal(store_a.v[:], store_b.v[:])
+        assert np.array_equal(store_a.log_w[:], store_b.log_w[:])
+
+    def test_store_getitem_batch(self):
+        store = Store.memory_store(simulator=sim_multi_out)
+        indices = store.sample(100, prior, add=True)
+        store.simulate(indices)
+        batch = indices[[5, 1, 3]]
+        sims, v = store[batch]
+        assert v.shape == (3, 2)
+        assert sims["x2"].shape == (3, 2, 5)
+        for j, i in enumerate(batch):
+            sim_i, v_i = store[i]
+            assert np.allclose(v[j], v_i)
+            assert np.allclose(sims["x1"][j], sim_i["x1"])
+
+    def test_dataset_getitems_matches_getitem(self):
+        store = Store.memory_store(simulator=sim_multi_out)
+        store.add(100, prior)
+        store.simulate()
+        dataset = Dataset(100, prior, store)
+        batch = [5, 1, 3, 1]
+        items = dataset.__getitems__(batch)
+        assert len(items) == len(batch)
+        for (x, u, v), i in zip(items, batch):
+            x_i, u_i, v_i = dataset[i]
+            assert torch.allclose(u, u_i)
+            assert torch.allclose(v, v_i)
+            for key in x_i:
+                assert torch.allclose(x[key], x_i[key])
+
+    def test_store_get_parameters(self):
+        store = Store.memory_store(simulator=sim)
+        store.add(50, prior)
+        assert np.array_equal(store.get_parameters(), store.v[:])
+        assert np.array_equal(store.get_parameters([3, 1]), store.v.oindex[[3, 1]])
+        store.add(500, prior)
+        assert len(store.get_parameters()) == len(store.v)
+
+    def test_store_get_parameters_not_aliased(self):
+        store = Store.memory_store(simulator=sim)
+        store.add(50, prior)
+        expected = store.v[3]
+        v = store.get_parameters(3)
+        v[:] = -1.0
+        assert np.array_equal(store.get_parameters(3), expected)
+        assert not store.get_parameters().flags.writeable
+
+    def test_store_log_lambda(self):
+        store = Store.memory_store(simulator=sim)
+        z = np.random.rand(30, 2) * np.array([1.0, 0.5])
+        assert np.all(store.log_lambda(z) == -np.inf)
+        store.add(50, prior)
+        store.add(200, prior)
+        expected = np.max(
+            [pdf.log_prob(z) + np.log(N) for pdf, N in store._get_intensities()],
+            axis=0,
+        )
+        assert np.allclose(store.log_lambda(z), expected)
+
+    @pytest.mark.parametrize(
+        "indices", [[3, 4, 5, 6], [6, 4, 5], [2, 2, 3], [7], np.arange(10, 20)]
+    )
+    def test_store_set_simulation_status(self, indices):
+        store = Store.memory_store(simulator=sim)
+        store.add(50, prior)
+        store._set_simulation_status(indices, SimulationStatus.FAILED)
+        status = store.get_simulation_status()
+        expected = np.full(len(store), SimulationStatus.PENDING)
+        expected[indices] = SimulationStatus.FAILED
+        assert np.array_equal(status, expected)
+
+    def test_store_sample_block_wise(self):
+        store = Store.memory_store(simulator=sim)
+        indices = store.sample(100, prior, add=True)
+        store._block_size = 7
+        assert np.array_equal(store.sample(100, prior), indices)
+
     def test_memory_store_simulate(self):
         store = Store.memory_store(simulator=sim_multi_out)
         indices = store.sample(100, prior, add=True)
@@ -172,6 +292,17 @@ class TestStoreRun:
         assert store.sims.x1[49].sum() != 0
         assert store.sims.x1[50].sum() == 0
 
+    def test_store_requires_sim(self):
+        store = Store.memory_store(simulator=sim)
+        indices = store.sample(100, prior, add=True)
+        assert store.requires_sim()
+        store.simulate(indices[:50])
+        assert not store.requires_sim(list(indices[:50]))
+        assert store.requires_sim(list(indices[40:60]))
+        assert np.array_equal(
+            store._get_indices_to_simulate(list(indices[40:60])), indices[50:60]
+        )
+
     def test_directory_store_sample(self):
         with tempfile.TemporaryDirectory() as td:
             store = Store.directory_store(
@@ -218,6 +349,7 @@ class TestStoreRun:
         store.add(10, prior)
         store.simulate()
         assert all(store.sim_status[:] == SimulationStatus.FAILED)
+        assert store.any_failed
 
     def test_interrupted_dasksimulator_failed(self):
         with tempfile.TemporaryDirectory() as tmpdir: